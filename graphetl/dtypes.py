@@ -73,20 +73,91 @@ MySQL Python connector datatypes
     
 """
 
-import tables as tb
+from types import MappingProxyType
 import numpy as np
+from mysql.connector import FieldType
 
 # see also:
 # http://mysql-python.sourceforge.net/MySQLdb-1.2.2/public/MySQLdb.constants.FIELD_TYPE-module.html
 map_numpy = {
     'VAR_STRING': str,
-    'LONG': np.int16,
-    'FLOAT': np.float
+    'TINY': np.int8,
+    'SHORT': np.int16,
+    'INT24': np.int32,
+    'LONG': np.int32,
+    'LONGLONG': np.int64,
+    'FLOAT': np.float32,
+    'DOUBLE': np.float64,
+    'DATETIME': 'datetime64[us]'
 }
 
+# NumPy dtypes of the PyTables arrays that MySQL fields are stored in.
+# Read-only, since it is shared by every table.
 # TODO: Figure out variable length string atoms with references in the actual table. Or calibrate string field width (or both).
-map_pytables = {
-    'VAR_STRING': tb.StringCol(32),  # 32 is relatively arbitrary - pytables doesn't support variable length strings
-    'LONG': tb.Int16Col(),
-    'FLOAT': tb.Float16Col()
-}
\ No newline at end of file
+map_pytables = MappingProxyType({
+    'VAR_STRING': np.dtype('S32'),  # 32 is relatively arbitrary - pytables doesn't support variable length strings
+    'TINY': np.dtype(np.int8),
+    'SHORT': np.dtype(np.int16),
+    'INT24': np.dtype(np.int32),  # MEDIUMINT
+    'LONG': np.dtype(np.int32),  # INT
+    'LONGLONG': np.dtype(np.int64),
+    'FLOAT': np.dtype(np.float32),
+    'DOUBLE': np.dtype(np.float64)
+})
+
+# Overrides for `UNSIGNED` integer columns, which don't fit the signed types
+map_pytables_unsigned = MappingProxyType({
+    'TINY': np.dtype(np.uint8),
+    'SHORT': np.dtype(np.uint16),
+    'INT24': np.dtype(np.uint32),
+    'LONG': np.dtype(np.uint32),
+    'LONGLONG': np.dtype(np.uint64)
+})
+
+# Lookup tables from the integer field type codes found in MySQL cursor
+# descriptions straight to PyTables array dtypes (`None` if unsupported),
+# for signed and unsigned columns
+_mysql_typecode_names = {code: name for code, name in FieldType.desc.values()}
+MYSQL_TYPECODE_TO_PT = tuple(
+    map_pytables.get(_mysql_typecode_names.get(code)) for code in range(256)
+)
+MYSQL_TYPECODE_TO_PT_UNSIGNED = tuple(
+    map_pytables_unsigned.get(_mysql_typecode_names.get(code), signed_dtype)
+    for code, signed_dtype in enumerate(MYSQL_TYPECODE_TO_PT)
+)
+
+# `information_schema.COLUMNS.DATA_TYPE` values, mapped to the field type code
+# that a cursor description reports for a column of that type. DATA_TYPE
+# doesn't include `UNSIGNED`; that has to be read from COLUMN_TYPE.
+MYSQL_DATA_TYPE_TO_TYPECODE = {
+    'decimal': FieldType.NEWDECIMAL,
+    'tinyint': FieldType.TINY,
+    'smallint': FieldType.SHORT,
+    'mediumint': FieldType.INT24,
+    'int': FieldType.LONG,
+    'bigint': FieldType.LONGLONG,
+    'float': FieldType.FLOAT,
+    'double': FieldType.DOUBLE,
+    'bit': FieldType.BIT,
+    'year': FieldType.YEAR,
+    'date': FieldType.DATE,
+    'time': FieldType.TIME,
+    'datetime': FieldType.DATETIME,
+    'timestamp': FieldType.TIMESTAMP,
+    'char': FieldType.STRING,
+    'binary': FieldType.STRING,
+    'enum': FieldType.STRING,
+    'set': FieldType.STRING,
+    'varchar': FieldType.VAR_STRING,
+    'varbinary': FieldType.VAR_STRING,
+    'tinytext': FieldType.BLOB,
+    'text': FieldType.BLOB,
+    'mediumtext': FieldType.BLOB,
+    'longtext': FieldType.BLOB,
+    'tinyblob': FieldType.BLOB,
+    'blob': FieldType.BLOB,
+    'mediumblob': FieldType.BLOB,
+    'longblob': FieldType.BLOB,
+    'json': FieldType.JSON,
+    'geometry': FieldType.GEOMETRY,
+}
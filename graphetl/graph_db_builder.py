@@ -16,7 +16,7 @@ Algorithm overview
         - For each node type $N$ in $\mathcal{N}$:
             - Find all source databases $\mathcal{S}_N$ containing instances of $N$
             - Get a merged list of data fields (and their types) across $\mathcal{S}_N$
-            - Initialize a PyTables table for $N$ with appropriate fields
+            - Initialize a PyTables group for $N$ holding one array per field
         - For each relationship type $R$ in $\mathcal{R}$:
             - # TODO
 - Build database
@@ -31,49 +31,77 @@ Algorithm overview
 """
 
 from yaml import load
-from dataclasses import dataclass, field
 import logging
 try:
-    from yaml import CLoader as Loader
+    from yaml import CSafeLoader as Loader
 except ImportError:
-    from yaml import Loader
-from tqdm import tqdm
+    from yaml import SafeLoader as Loader
+    logging.getLogger(__name__).warning("LibYAML not found - config files will be parsed with the (much slower) pure-Python loader.")
+import hashlib
+import itertools
+import os
+import pickle
+import queue
+import tempfile
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import nullcontext
 from collections import defaultdict
+from tqdm import tqdm
 import mysql.connector
 from mysql.connector import FieldType
 import tables
 import numpy as np
 import unicodedata
 
-from .sql_io import get_mysql_connection
-from .dtypes import *
+from .sql_io import get_mysql_connection, get_mysql_server
+from .dtypes import MYSQL_TYPECODE_TO_PT, MYSQL_TYPECODE_TO_PT_UNSIGNED, MYSQL_DATA_TYPE_TO_TYPECODE
+
+logger = logging.getLogger(__name__)
+
+BATCH_SIZE = 10_000  # number of rows fetched from a source and appended at once
+FLUSH_EVERY = 10  # number of batches appended between flushes to disk
+QUEUE_DEPTH = 2  # number of packed batches that can wait to be appended
+MAX_WORKERS = 8  # maximum number of sources parsed concurrently
+
+# Storage options for the arrays in the HDF5 database
+FILTERS = tables.Filters(complib='blosc:lz4', complevel=5, shuffle=True)
+CHUNK_BYTES = 1 << 20  # target (uncompressed) size of each HDF5 chunk
+MIN_CHUNK_BYTES = 1 << 16  # smallest chunk size used, even for small tables
+EXPECTED_ROWS = 1_000_000  # default size hint for node tables
 
-import ipdb
+# Source table schemas from earlier runs, keyed by SHA-256 of the config file
+# and the MySQL server it was run against
+SCHEMA_CACHE_PATH = os.path.join(
+    os.environ.get('XDG_CACHE_HOME', os.path.expanduser('~/.cache')), 'graphetl', 'schemas.pkl')
+SCHEMA_CACHE_FORMAT = 2  # bump when the shape of cached descriptions changes
 
-logging.basicConfig(level=logging.DEBUG)
+class _SlottedRecord:
+    """Base for small record classes that use `__slots__` instead of an
+    instance `__dict__`."""
+    __slots__ = ()
 
-@dataclass
-class NodeType:
-    node_type_label: str
-    dest_table: tables.Table
-    sources: list = field(default_factory=list)
+    def __repr__(self):
+        attrs = ", ".join("{0}={1!r}".format(a, getattr(self, a)) for a in self.__slots__)
+        return "{0}({1})".format(type(self).__name__, attrs)
 
-@dataclass
-class RelationshipType:
-    rel_type_label: str
-    start_node_type: NodeType
-    end_node_type: NodeType
-    dest_table: tables.Table
-    sources: list = field(default_factory=list)
+class NodeType(_SlottedRecord):
+    __slots__ = ('node_type_label', 'dest_table', 'sources')
 
-def safe_itemgetter(*items):
-    if len(items) == 1:
-        item = items[0]
-        def g(obj):
-            return obj[item]
-    else:
-        def g(obj):
-            return tuple(obj[item] for item in items )
+    def __init__(self, node_type_label, dest_table, sources=None):
+        self.node_type_label = node_type_label
+        self.dest_table = dest_table  # keys: field names; values: tables.EArray
+        self.sources = [] if sources is None else sources
+
+class RelationshipType(_SlottedRecord):
+    __slots__ = ('rel_type_label', 'start_node_type', 'end_node_type', 'dest_table', 'sources')
+
+    def __init__(self, rel_type_label, start_node_type, end_node_type, dest_table, sources=None):
+        self.rel_type_label = rel_type_label
+        self.start_node_type = start_node_type
+        self.end_node_type = end_node_type
+        self.dest_table = dest_table  # keys: field names; values: tables.EArray
+        self.sources = [] if sources is None else sources
 
 class GraphDBBuilder():
     """
@@ -87,28 +115,35 @@ class GraphDBBuilder():
     mysql_config_file : str
         Path to a MySQL configuration file (e.g., `~/.my.cnf`) with read
         privileges for any MySQL source databases mentioned in the config file.
+    use_schema_cache : bool, optional
+        Reuse source table schemas (and approximate row counts) probed by
+        earlier runs with an identical config file against the same MySQL
+        server (see `SCHEMA_CACHE_PATH`). Off by default; only enable this if
+        source tables won't have been altered since the last run.
     """
-    def __init__(self, config_file_path, mysql_config_file):
-        logging.info("Reading configuration file.")
+    def __init__(self, config_file_path, mysql_config_file, use_schema_cache=False):
+        logger.info("Reading configuration file.")
         self.config = read_config_file(config_file_path)
         self.mysql_config_file = mysql_config_file
 
         self.nodes = dict()  # keys: node labels; values: NodeType
         self.relationships = dict()  # keys: relationship type labels; values: RelationshipType
         self.source_field_lists = dict()  # dict (key - source) of dicts (key - table; value - list of field names)
-
-        try:
-            if mysql_config_file:
-                logging.info("Establishing MySQL connection...")
-                self.mysql_conn = get_mysql_connection(mysql_config_file)
-                logging.info("...done.")
-            else:
-                logging.warning("No MySQL configuration provided - was this intentional?")
-                self.mysql_conn = get_mysql_connection()
-        except mysql.connector.Error as err:
-            logging.warning("Warning: Error connecting to MySQL using the provided connection details. Skipping MySQL sources.")
-            print(err)
-            self.mysql_conn = None
+        self.table_schemas = dict()  # keys: (source, table); values: list of (field name, NumPy dtype)
+        self.use_schema_cache = use_schema_cache
+        self.schema_cache_key = None
+        # keys: (source, table); values: list of (field name, MySQL type code, unsigned)
+        self.table_descriptions = dict()
+        # keys: (source, table); values: approximate row count (or None if unknown)
+        self.table_row_estimates = dict()
+        if use_schema_cache:
+            self.schema_cache_key = schema_cache_key(config_file_path, mysql_config_file)
+            self.table_descriptions, self.table_row_estimates = load_schema_cache(self.schema_cache_key)
+        self._new_table_descriptions = False
+        self.h5_lock = threading.Lock()  # PyTables isn't thread-safe, so all HDF5 writes go through this
+
+        if not mysql_config_file:
+            logger.warning("No MySQL configuration provided - was this intentional?")
 
         self._process_config()
 
@@ -135,6 +170,9 @@ class GraphDBBuilder():
         """
         Create empty PyTables tables for all node types and relationship types.
 
+        Tables are stored column-wise: each node (or relationship) type gets
+        its own HDF5 group, containing one extendable array per data field.
+
         Notes
         -----
         This method is a bit more sophisticated than just creating an empty
@@ -149,72 +187,164 @@ class GraphDBBuilder():
         db_version = self.config['Database']['version']
 
         # Make pytables file and groups
-        logging.info("Making HDF5 database...")
+        logger.info("Making HDF5 database...")
         self.h5_file = tables.open_file("{0}-{1}.h5".format(db_name, db_version), mode='w', title=db_name)
         self.node_tables = self.h5_file.create_group("/", 'nodes', 'Node tables')
         self.relationship_tables = self.h5_file.create_group("/", 'relationships', 'Relationship tables')
 
-        mysql_query_template = "SELECT * FROM {0} LIMIT 1;"
-
         node_tables_pre = {}
         relationship_tables_pre = {}
 
-        # Determine node table names and fields
-        logging.info(" Making tables for each node type...")
-        for node_label, node_label_config in self.config['Nodes'].items():
-            logging.info(f"  NODE TYPE: {node_label}")
-
-            all_sources_fields = []
-            for s_name, s_config in node_label_config['sources'].items():
-                logging.info(f"   SOURCE DB: {s_name}")
-                if self.source_type_map[s_name] == 'mysql':
-                    logging.info(f"    DB TYPE: mysql")
-                    # query the database, pull out fields
-                    this_qry = mysql_query_template.format(s_config['table'])
-                    this_cur = self.mysql_dbs[s_name].cursor(buffered=True)
-                    this_cur.execute(this_qry)
-
-                    field_descr = description_to_fields(this_cur.description)
-                    field_names, field_types = list(zip(*field_descr))
-
-                    # If we haven't seen this source already, store field names
-
-                    # Make sure we have a dict for the source
-                    if not s_name in self.source_field_lists:
-                        self.source_field_lists[s_name] = dict()
-                    # Then, add the field names for the table to this dict
-                    if not s_config['table'] in self.source_field_lists[s_name]:
-                        self.source_field_lists[s_name][s_config['table']] = field_names
-
-                    # now, map fields to pytables types
-                    np_types = [map_pytables[x] for x in field_types]
-                    types_structured = list(zip(field_names, np_types))
-                    logging.info(f"    FIELDS: {field_names}")
-                else:
-                    raise NotImplementedError
-
-                all_sources_fields += types_structured
-            
-            # merge fields from all sources
-            node_fields_merged = merge_fields(all_sources_fields)
-
-            #data_descr = np.dtype(node_fields_merged)
-            # See: https://stackoverflow.com/questions/58261748 ("Option 2")
-            data_descr = make_table_dict_descr(node_fields_merged)
-
-            node_tables_pre[node_label] = data_descr
+        try:
+            # Look up the fields of every MySQL source table up front, with a
+            # single query per database (sources in the same database share a
+            # connection)
+            cnx_tables = defaultdict(set)  # keys: MySQL connection; values: set of (source, table)
+            for node_label_config in self.config['Nodes'].values():
+                for s_name, s_config in node_label_config['sources'].items():
+                    if self.source_type_map[s_name] == 'mysql':
+                        cnx_tables[self.mysql_dbs[s_name]].add((s_name, s_config['table']))
+            for cnx, source_tables in cnx_tables.items():
+                self._probe_source_schemas(cnx, source_tables)
+
+            # Determine node table names and fields
+            logger.info(" Making tables for each node type...")
+            for node_label, node_label_config in self.config['Nodes'].items():
+                logger.info("  NODE TYPE: %s", node_label)
+
+                # Fields merged across all sources, in the order they are first
+                # seen, so a node table's column order is the same from run to run
+                node_fields = {}  # keys: field names; values: NumPy dtype
+                for s_name, s_config in node_label_config['sources'].items():
+                    logger.debug("   SOURCE DB: %s", s_name)
+                    if self.source_type_map[s_name] == 'mysql':
+                        logger.debug("    DB TYPE: mysql")
+                        # Fields were looked up above (or loaded from the schema cache)
+                        field_descr = self._probe_table_schema(s_name, s_config['table'])
+                        field_names = tuple(name for name, _ in field_descr)
+
+                        # If we haven't seen this source already, store field names
+
+                        # Make sure we have a dict for the source
+                        if not s_name in self.source_field_lists:
+                            self.source_field_lists[s_name] = dict()
+                        # Then, add the field names for the table to this dict
+                        if not s_config['table'] in self.source_field_lists[s_name]:
+                            self.source_field_lists[s_name][s_config['table']] = field_names
+
+                        logger.debug("    FIELDS: %s", field_names)
+                    else:
+                        raise NotImplementedError
+
+                    for name, dtype in field_descr:
+                        prev = node_fields.setdefault(name, dtype)
+                        if prev != dtype:
+                            raise ValueError("Field `{0}` of node type {1} has conflicting types across sources ({2} vs. {3}).".format(
+                                name, node_label, prev, dtype))
+
+                node_tables_pre[node_label] = np.dtype(list(node_fields.items()))
+        finally:
+            # Schema discovery is done, and `parse_nodes` opens its own connections
+            self._close_discovery_connections()
 
         # Build the node tables
         for label, fields in node_tables_pre.items():
             # Make the table
-            tab_ref = make_table(self.h5_file, self.node_tables, label, fields)
+            tab_ref = make_table(self.h5_file, self.node_tables, label, fields, self._expected_rows(label))
             # Store reference to table along with metadata
             self._store_table_details(tab_ref, label, fields, 'node')
 
+        if self.use_schema_cache and self._new_table_descriptions:
+            save_schema_cache(self.schema_cache_key, self.table_descriptions, self.table_row_estimates)
+
         # TODO: Rinse and repeat for relationship tables
 
         return True
 
+    def _probe_table_schema(self, source_name, table_name):
+        """
+        Return the fields of a MySQL source table, as a list of (field name,
+        NumPy dtype) tuples.
+
+        Results are memoized per (source, table), so a table that holds more
+        than one node type is only probed once. Unless the schema cache is
+        disabled, descriptions are also reused across runs.
+        """
+        key = (source_name, table_name)
+        if key not in self.table_schemas:
+            if key not in self.table_descriptions:
+                self._probe_source_schemas(self.mysql_dbs[source_name], [key])
+            self.table_schemas[key] = description_to_fields(self.table_descriptions[key])
+
+        return self.table_schemas[key]
+
+    def _expected_rows(self, node_label):
+        """
+        Return the number of rows a node type's table is expected to hold.
+
+        This is the node type's `expected_rows` config setting if there is
+        one, or else the total of its source tables' approximate row counts
+        (or `EXPECTED_ROWS`, if none of those are known).
+        """
+        node_config = self.config['Nodes'][node_label]
+        if 'expected_rows' in node_config:
+            return node_config['expected_rows']
+
+        row_estimates = [self.table_row_estimates.get((s_name, s_config['table']))
+                         for s_name, s_config in node_config['sources'].items()]
+        return sum(n for n in row_estimates if n) or EXPECTED_ROWS
+
+    def _probe_source_schemas(self, cnx, source_tables):
+        """
+        Look up the fields of several tables in one MySQL database with a
+        single `information_schema` query, and store them in
+        `table_descriptions` as lists of (field name, MySQL field type code,
+        unsigned) tuples. The server's approximate row count for each table is stored
+        in `table_row_estimates`.
+
+        `source_tables` holds (source, table) pairs for sources whose
+        connection is `cnx`. Tables whose descriptions are already known are
+        skipped.
+        """
+        missing = sorted(key for key in source_tables if key not in self.table_descriptions)
+        if not missing:
+            return
+        table_names = sorted({table_name for _, table_name in missing})
+
+        cur = cnx.cursor()
+        cur.execute(
+            "SELECT c.TABLE_NAME, c.COLUMN_NAME, c.DATA_TYPE, c.COLUMN_TYPE, t.TABLE_ROWS "
+            "FROM information_schema.COLUMNS c JOIN information_schema.TABLES t "
+            "ON t.TABLE_SCHEMA = c.TABLE_SCHEMA AND t.TABLE_NAME = c.TABLE_NAME "
+            "WHERE c.TABLE_SCHEMA = DATABASE() AND c.TABLE_NAME IN ({0}) "
+            "ORDER BY c.TABLE_NAME, c.ORDINAL_POSITION;".format(", ".join(["%s"] * len(table_names))),
+            tuple(table_names)
+        )
+        descriptions = defaultdict(list)
+        row_estimates = dict()
+        for table_name, column_name, data_type, column_type, table_rows in cur.fetchall():
+            # Some server/connector combinations return information_schema text as bytes
+            table_name, column_name, data_type, column_type = (
+                v.decode() if isinstance(v, (bytes, bytearray)) else v
+                for v in (table_name, column_name, data_type, column_type))
+            typecode = MYSQL_DATA_TYPE_TO_TYPECODE.get(data_type.lower())
+            if typecode is None:
+                raise NotImplementedError("No PyTables type for field `{0}` (MySQL type {1}).".format(
+                    column_name, data_type))
+            # e.g. 'int(10) unsigned' (DATA_TYPE would just be 'int')
+            unsigned = 'unsigned' in column_type.lower()
+            descriptions[table_name].append((column_name, typecode, unsigned))
+            row_estimates[table_name] = table_rows  # NULL for views
+        cur.close()
+
+        for source_name, table_name in missing:
+            if table_name not in descriptions:
+                raise ValueError("Table `{0}` not found in the database for source {1}.".format(
+                    table_name, source_name))
+            self.table_descriptions[(source_name, table_name)] = descriptions[table_name]
+            self.table_row_estimates[(source_name, table_name)] = row_estimates[table_name]
+        self._new_table_descriptions = True
+
     def _store_table_details(self, table_ref, node_or_rel_label, table_fields, table_type):
         """Store internal description of an HDF5 table to be organized into a
         'directory of node tables'.
@@ -231,13 +361,12 @@ class GraphDBBuilder():
             )
             self.nodes[node_or_rel_label] = node
 
-            logging.info("New node type added to PyGraphETL:")
-            logging.info(node)
+            logger.debug("New node type added to PyGraphETL: %s", node)
 
             # Add source mapping info
             # TODO: Can we move this out of the 'if' block and repurpose for rels?
             for s_name, s_config in self.config['Nodes'][node_or_rel_label]['sources'].items():
-                self.add_source_to_node_type(self.nodes[node_or_rel_label], s_name, s_config, table_fields)
+                self.add_source_to_node_type(self.nodes[node_or_rel_label], s_name, s_config, table_fields.names)
         elif table_type == 'relationship':
             rel = RelationshipType(
                 rel_type_label=node_or_rel_label, start_node_type=None,
@@ -245,8 +374,7 @@ class GraphDBBuilder():
             )
             self.relationships[node_or_rel_label] = rel
 
-            logging.info("New relationship type added to PyGraphETL:")
-            logging.info(rel)
+            logger.debug("New relationship type added to PyGraphETL: %s", rel)
         else:
             raise TypeError("`table_type` must one of {'node', 'relationship'}.")
     
@@ -267,30 +395,36 @@ class GraphDBBuilder():
         target_fields : list
         """
 
-        #ipdb.set_trace()
         source_fields = self.source_field_lists[source_name][source_config['table']]
 
         # Make mapping function (maps source fields to target fields).
         # If a target field isn't defined for a source, the value should map to
         # `None`.
-        field_idx_map = []
-        for field in target_fields:
-            # Find field in source (if it exists)
-            try:
-                field_idx_map.append(source_fields.index(field))
-            except ValueError:
-                field_idx_map.append(None)
+        source_idx = {name: i for i, name in enumerate(source_fields)}
+        field_idx_map = [source_idx.get(field) for field in target_fields]
+
+        # Only the source fields that map to a target field are selected, in
+        # target field order, so the batch packer (see `parse_mysql_source`)
+        # indexes into that projection
+        select_fields = [source_fields[i] for i in field_idx_map if i is not None]
+        select_idxs = iter(range(len(select_fields)))
+        select_idx_map = [None if i is None else next(select_idxs) for i in field_idx_map]
+
+        target_dtypes = [col.atom.dtype for col in node_type.dest_table.values()]
 
         node_type.sources.append({
             'source_name': source_name,
             'source_table_name': source_config['table'],
             'config_file_data': source_config,
             'field_names': source_fields,
-            'field_idx_map': field_idx_map
+            'field_idx_map': field_idx_map,
+            'select_fields': select_fields,
+            'select_idx_map': select_idx_map,
+            'target_dtypes': target_dtypes
         })
         
     def _process_config(self):
-        logging.info("Parsing configuration...")
+        logger.info("Parsing configuration...")
         try:
             self.db_name = self.config['Database']['name']
             self.db_version = self.config['Database']['version']
@@ -300,49 +434,92 @@ class GraphDBBuilder():
             self.source_config = self.config['Sources']
 
             mysql_dbs = dict()
+            # Sources in the same database share a connection for schema
+            # discovery (`parse_nodes` opens its own connection per task)
+            # keys: (database name, compress); values: MySQL connection
+            mysql_connections = dict()
             self.source_type_map = dict()
 
-            logging.info(" Parsing sources:")
+            logger.info(" Parsing sources:")
             for source_name, source_config in self.config['Sources'].items():
-                logging.info(f"  {source_name}")
+                logger.info("  %s", source_name)
                 self.source_type_map[source_name] = source_config['source type']
                 
                 if source_config['source type'] == 'mysql':
                     try:
-                        if self.mysql_config_file:
-                            cnx = get_mysql_connection(self.mysql_config_file, database=source_config['database name'])
-                        else:
-                            cnx = get_mysql_connection(database = source_config['database name'])
-                        mysql_dbs[source_name] = cnx
+                        compress = source_config.get('compress', False)
+                        cnx_key = (source_config['database name'], compress)
+                        if cnx_key not in mysql_connections:
+                            mysql_connections[cnx_key] = self._connect_source(source_name)
+                        mysql_dbs[source_name] = mysql_connections[cnx_key]
                     except mysql.connector.Error as err:
-                        print("Warning: Couldn't establish connection to MySQL database for {0}. Skipping this source.".format(source_name))
-                        print(err)
+                        logger.warning("Couldn't establish connection to MySQL database for %s. Skipping this source. (%s)",
+                                       source_name, err)
                 else:
                     raise NotImplementedError("Need to implement parsing of non-MySQL sources.")
 
             self.mysql_dbs = mysql_dbs
 
         except KeyError as e:
-            print("Error: Key not found.")
-            print(e)
-            print("Your config file is probably not correctly formatted.")
-            print("Please check the documentation.")
+            logger.error("Key not found: %s. Your config file is probably not correctly formatted - "
+                         "please check the documentation.", e)
+
+    def _close_discovery_connections(self):
+        """Close the connections shared by sources for schema discovery."""
+        for cnx in set(self.mysql_dbs.values()):
+            cnx.close()
+        self.mysql_dbs = dict()
+
+    def _connect_source(self, source_name):
+        """Open a new connection to the database of a MySQL source."""
+        source_config = self.config['Sources'][source_name]
+        compress = source_config.get('compress', False)
+        if self.mysql_config_file:
+            return get_mysql_connection(self.mysql_config_file, database=source_config['database name'],
+                                        compress=compress)
+        return get_mysql_connection(database = source_config['database name'], compress=compress)
 
     def parse_nodes(self):
         """
         For each node type in the config, and for each source containing nodes
         of that type, read the node data and feed into the appropriate pytables
         object.
+
+        Each (node type, source) pair is parsed as a separate task on a thread
+        pool of up to `MAX_WORKERS` threads, with its own MySQL connection.
+        Sources of the same node type are appended to its table concurrently,
+        a batch at a time, so the order of rows within a node table (and
+        which source a row came from) isn't deterministic between runs. Rows
+        themselves are never split across batches, so fields stay aligned.
+
+        If any task fails, tasks that haven't started yet are cancelled and
+        the error is re-raised once the running ones have finished.
         """
-        logging.info("Parsing nodes...")
-        for node_label, node_config in self.config['Nodes'].items():
-            logging.info(f"  node label: {node_label}")
-            for this_node_source, source_options in node_config['sources'].items():
-                logging.info(f"    source: {this_node_source}")
-                self._parse_source_dispatcher(node_label, this_node_source, source_options)
+        logger.info("Parsing nodes...")
+        tasks = [(node_label, this_node_source, source_options)
+                 for node_label, node_config in self.config['Nodes'].items()
+                 for this_node_source, source_options in node_config['sources'].items()]
+
+        n_workers = max(1, min(MAX_WORKERS, len(tasks)))
+        with ThreadPoolExecutor(max_workers=n_workers) as executor:
+            futures = [executor.submit(self._parse_source_task, *task) for task in tasks]
+            # Re-raise any errors from the worker threads
+            try:
+                for future in futures:
+                    future.result()
+            except BaseException:
+                for future in futures:
+                    future.cancel()
+                raise
+
+    def _parse_source_task(self, node_label, source_name, source_options):
+        """Parse one node type from one source (run on a worker thread)."""
+        logger.info("  node label: %s; source: %s", node_label, source_name)
+        self._parse_source_dispatcher(node_label, source_name, source_options)
 
     def parse_relationships(self):
-        raise NotImplementedError
+        # TODO: Relationship tables aren't created yet (see `_initialize_tables`)
+        logger.warning("Parsing relationships is not implemented yet - skipping.")
             
     def _parse_source_dispatcher(self, node_label, source_name, node_source_options):
         """
@@ -365,11 +542,7 @@ class GraphDBBuilder():
         sources = self.nodes[node_label].sources
         this_source = next(s for s in sources if s['source_name'] == source_name)
         
-        source_fields = this_source['field_names']
-        source_field_idx_map = this_source['field_idx_map']
-
         if source_type == 'mysql':
-            source_cnx = self.mysql_dbs[source_name]
             source_name = this_source['source_name']
             source_table = node_source_options['table']
             source_id_key = node_source_options['id_key']
@@ -379,14 +552,23 @@ class GraphDBBuilder():
             # destination tables
 
             dest_table = self.find_destination_table(node_label)
-            
-            parse_mysql_source(source_cnx, node_label, source_name, source_table, 
-                               source_id_key, source_uri_key, dest_table,
-                               source_fields, source_field_idx_map)
+
+            # A connection of its own, so this can run alongside other tasks
+            # reading from the same database
+            source_cnx = self._connect_source(source_name)
+            try:
+                parse_mysql_source(source_cnx, node_label, source_name, source_table,
+                                   source_id_key, source_uri_key, dest_table,
+                                   this_source['select_fields'], this_source['select_idx_map'],
+                                   this_source['target_dtypes'],
+                                   write_lock=self.h5_lock,
+                                   expected_rows=self.table_row_estimates.get((source_name, source_table)))
+            finally:
+                source_cnx.close()
 
     def find_destination_table(self, node_label):
         """
-        Return a reference to the PyTables object corresponding to a certain
+        Return references to the PyTables objects corresponding to a certain
         node label.
 
         Parameters
@@ -396,58 +578,39 @@ class GraphDBBuilder():
 
         Returns
         -------
-        tables.Table
-            PyTables table corresponding to `node_label`.
+        dict of tables.EArray
+            Per-field PyTables arrays corresponding to `node_label`, keyed by
+            field name.
         """
         return self.nodes[node_label].dest_table
 
-    def parse_relationships(self):
-        pass
-
     def serialize_data(self):
         pass
 
-def merge_fields(all_sources_fields):
-    """Aggregate a list of tuples describing table columns, combining any
-    duplicates and ensuring that datatypes aren't mixed.
-    """
-    fields_merged = []
-
-    field_names, _ = zip(*all_sources_fields)
-    field_names_unique = list(set(field_names))
+def description_to_fields(table_description):
+    """Convert a list of (field name, MySQL field type code, unsigned) tuples
+    describing a MySQL table to a list of (field name, NumPy dtype) tuples for
+    inclusion in the graph data, where the dtype is that of the PyTables
+    array the field is stored in."""
+    typecode_to_pt = MYSQL_TYPECODE_TO_PT
+    typecode_to_pt_unsigned = MYSQL_TYPECODE_TO_PT_UNSIGNED
 
-    for name in field_names_unique:
-        dtypes_list = [v for n, v in all_sources_fields if n == name]
-
-        assert len(set([x.type for x in dtypes_list])) <= 1
-        
-        fields_merged.append((name, dtypes_list[0]))
-
-    return fields_merged
-
-def description_to_fields(mysql_cur_description):
-    """Convert a MySQL cursor description to a list of fields for inclusion in
-    the graph data."""
     fields = []
-    for f_data in mysql_cur_description:
-        column_name = f_data[0]
-        dtype_num = f_data[1]
-        dtype_name = FieldType.get_info(f_data[1])
-        null_ok = f_data[6]
-        column_flags = f_data[7]
-        fields.append((
-            column_name,
-            dtype_name
-        ))
+    for column_name, typecode, unsigned in table_description:
+        col_dtype = (typecode_to_pt_unsigned if unsigned else typecode_to_pt)[typecode]
+        if col_dtype is None:
+            raise NotImplementedError("No PyTables type for field `{0}` (MySQL type {1}).".format(
+                column_name, FieldType.get_info(typecode)))
+        fields.append((column_name, col_dtype))
 
     return fields
 
 def parse_mysql_source(cnx, node_type, source_name, source_table, source_id_key,
-                       source_uri_key, destination_table, source_fields,
-                       source_field_idx_map):
+                       source_uri_key, destination_table, select_fields,
+                       field_idx_map, dtypes, write_lock=None, expected_rows=None):
     """
     Parse records from a source MySQL table and stream the results into a
-    destination PyTables table.
+    destination set of PyTables arrays.
     
     Arguments
     ---------
@@ -467,97 +630,345 @@ def parse_mysql_source(cnx, node_type, source_name, source_table, source_id_key,
     source_uri_key : str
         Column name that will be used to determine the URI of the node in the
         output graph database.
-    destination_table : tables.Table
-        A PyTables table object where the parsed nodes will be placed.
-    source_fields : tuple of str
-        Ordered tuple of fields corresponding to columns in the data source.
-    source_field_idx_map : list of int
-        List of indices of the source table mapped to their equivalent order in
-        the destination table. If a source table doesn't contain one (or more)
-        of the fields present in the destination table, they should map to
-        `None` (i.e., they should be filled with the default value for that
-        field).
+    destination_table : dict of tables.EArray
+        PyTables arrays (one per field, keyed by field name) where the parsed
+        nodes will be placed.
+    select_fields : list of str
+        Fields to read from the source table (only those that map to a field
+        in the destination table).
+    field_idx_map : list of int
+        For each destination field, its index in `select_fields`, or `None`
+        if the source doesn't have that field.
+    dtypes : list of numpy.dtype
+        Destination field dtypes, in the same order as `destination_table`.
+    write_lock : threading.Lock, optional
+        Lock held while writing to the destination arrays, if they may also be
+        written to from other threads.
+    expected_rows : int, optional
+        Approximate number of rows in the source table, used as the total for
+        the progress bar. (An exact `COUNT(*)` would cost a full scan of the
+        table before reading it.)
     """
-    cursor = cnx.cursor()
-    sql_query = "SELECT * FROM {0};".format(source_table)
+    # Unbuffered, so rows are read off the connection as they are fetched
+    # rather than all being pulled into client memory by `execute()`. As a
+    # prepared statement, results come back in the (typed) binary protocol
+    # rather than as text that has to be parsed on the client.
+    cursor = cnx.cursor(buffered=False, prepared=True)
+    sql_query = "SELECT {0} FROM `{1}`".format(
+        ", ".join("`{0}`".format(f) for f in select_fields), source_table)
     cursor.execute(sql_query)
 
-    # Stream results into the PyTables table
-    result = safe_stream_mysql_to_pytable(cursor, destination_table, source_fields, source_field_idx_map)
+    # Stream results into the PyTables arrays. The packer (and its buffers)
+    # only lives as long as this call, so memory isn't held between sources.
+    packer = make_batch_packer(field_idx_map, dtypes)
+    try:
+        result = safe_stream_mysql_to_pytable(cursor, destination_table, packer,
+                                              write_lock=write_lock, total_rows=expected_rows)
+    finally:
+        cursor.close()
 
 def convert_fields_from_descr():
     pass
 
-def safe_stream_mysql_to_pytable(mysql_cur, output_table, qry_fields, map_idxs, verbosity=0):
+def safe_stream_mysql_to_pytable(mysql_cur, output_table, packer, verbosity=0,
+                                 write_lock=None, total_rows=None):
     """
-    Stream results of a MySQL query into a PyTables table.
-
-    Notably, this function maintains a record of already-seen nodes (based on
-    the primary ID) and either merges data or creates a new entry, accordingly.
+    Stream results of a MySQL query into a column-wise PyTables table.
 
-    Rows are appended to the table individually.
-
-    TODO: Add functionality to insert data in blocks, for the sake of
-    efficiency.
+    Rows are pulled from the cursor in batches of `BATCH_SIZE` using
+    `fetchmany()`, packed into one NumPy array per destination field by
+    `packer`, and written with a single `EArray.append()` call per field per
+    batch. Fetching and packing run in a separate thread, up to `QUEUE_DEPTH`
+    batches ahead of the writes, so waiting on the MySQL server overlaps with
+    compressing and writing to HDF5. Fields that are missing from the source
+    (or NULL in a given row) are filled with the default value for the
+    destination column.
 
     Arguments
     ---------
-
+    mysql_cur : mysql.connector.cursor.MySQLCursor
+        Cursor on which the source query has already been executed.
+    output_table : dict of tables.EArray
+        Per-field PyTables arrays (keyed by field name) the query results will
+        be appended to.
+    packer : callable
+        Function converting a batch of rows into a list of arrays, in the same
+        order as `output_table` (see `make_batch_packer`). Its output must stay
+        valid for at least `QUEUE_DEPTH + 2` calls.
+    write_lock : threading.Lock, optional
+        Lock held while appending to `output_table`. Batches are fetched and
+        converted outside of the lock.
+    total_rows : int, optional
+        Number of rows the query is expected to return (used for the progress
+        bar). Doesn't need to be exact.
     """
 
-    # TODO: Check qry_fields against fields in destination_table to make sure
-    # everything matches up
+    columns = list(output_table.values())
 
-    BLOCK_SIZE = 10 # number of rows to add at once
-    
-    #ipdb.set_trace()
-    # block = []  # a block of rows we are going to add to the table
-    row = output_table.row
-    for query_res in tqdm(mysql_cur):
-        #row = [query_res[x] for x in map_idxs]
-        # Use dict-like API for inserting data by field name rather than as an
-        # ordered tuple.
-        # TODO: Evaluate speed difference of these two alternate methods
-        for f, d in zip(qry_fields, query_res):
+    if write_lock is None:
+        write_lock = nullcontext()
+
+    # Items are (n_rows, batch) tuples, then `None` at the end of the results
+    # (or the exception that stopped the producer)
+    batches = queue.Queue(maxsize=QUEUE_DEPTH)
+    stop = threading.Event()
+
+    def produce():
+        try:
+            while not stop.is_set():
+                rows = mysql_cur.fetchmany(BATCH_SIZE)
+                if not rows:
+                    break
+                batches.put((len(rows), packer(rows)))
+        except BaseException as err:
+            batches.put(err)
+        else:
+            batches.put(None)
+
+    producer = threading.Thread(target=produce, daemon=True)
+    producer.start()
+
+    try:
+        n_batches = 0
+        # Refresh at most twice a second; the rate shown is the average
+        # since the start, rather than a noisy per-batch rate
+        with tqdm(total=total_rows, unit=' rows', mininterval=0.5, smoothing=0) as pbar:
+            while True:
+                item = batches.get()
+                if item is None:
+                    break
+                if isinstance(item, BaseException):
+                    raise item
+                n_rows, batch = item
+
+                n_batches += 1
+                with write_lock:
+                    for col, col_data in zip(columns, batch):
+                        col.append(col_data)
+                    if n_batches % FLUSH_EVERY == 0:
+                        for col in columns:
+                            col.flush()
+                pbar.update(n_rows)
+    finally:
+        # If we stopped early, keep the queue drained until the producer
+        # notices, so it can't block forever on a full queue
+        stop.set()
+        while producer.is_alive():
             try:
-                row[f] = d
-            except TypeError as e:
-                if d is None:
-                    continue
-                row[f] = unicodedata.normalize('NFKD', d).encode('ascii', 'ignore')
-                #ipdb.set_trace()
-                #print(e)
-        row.append()
-
-        #ipdb.set_trace()
-        #block.append(row)
-        # if len(block) == BLOCK_SIZE:
-        #     output_table.append(block)
-        #     block.clear()
-    # Edge case - for last len(mysql_cur) \ BLOCK_SIZE rows
-    # output_table.append(block)
-    # block.clear()
-
-    #ipdb.set_trace()
+                batches.get(timeout=0.1)
+            except queue.Empty:
+                pass
+        producer.join()
+
+    with write_lock:
+        for col in columns:
+            col.flush()
+
     # TODO: Return something intelligent to check for possible errors
     return 1
 
+def make_batch_packer(field_idx_map, dtypes, batch_size=BATCH_SIZE, n_buffers=QUEUE_DEPTH + 2):
+    """
+    Generate a function that converts a batch of query results (a list of row
+    tuples) into a list of NumPy arrays, one per destination field.
+
+    The function is generated each time a source table is read (by
+    `parse_mysql_source`), with the source's field mapping written directly
+    into its code: each destination field is either
+    read from a fixed column of the (transposed) batch or filled with its
+    default value, with no per-batch lookups or branching. Only string fields
+    are converted with `batch_string_column` (which handles non-ASCII text);
+    numeric fields skip that path entirely.
+
+    Values are written into one buffer per destination field, allocated once
+    when the packer is generated. The packer cycles through `n_buffers` sets
+    of these buffers, and the returned arrays are views into them, so each
+    batch stays valid for the next `n_buffers - 1` calls.
+
+    Parameters
+    ----------
+    field_idx_map : list of int
+        For each destination field, the index of the matching field in the
+        query results, or `None` if the source doesn't have that field.
+    dtypes : list of numpy.dtype
+        Destination field dtypes, in the same order as `field_idx_map`.
+    batch_size : int, optional
+        Maximum number of rows per batch.
+    n_buffers : int, optional
+        Number of buffer sets to cycle through. By default, enough for
+        `safe_stream_mysql_to_pytable` to have every queued batch in flight.
+    """
+    # Fields missing from the source are never written to, so stay zeroed
+    buffer_sets = [[np.zeros(batch_size, dtype=dtype) for dtype in dtypes] for _ in range(n_buffers)]
+    namespace = {'batch_column': batch_column, 'batch_string_column': batch_string_column,
+                 'buffer_ring': itertools.cycle(buffer_sets)}
+    col_exprs = []
+    for k, (idx, dtype) in enumerate(zip(field_idx_map, dtypes)):
+        if idx is None:
+            col_exprs.append("bufs[{0}][:n]".format(k))
+            continue
+        namespace['dflt_{0}'.format(k)] = np.zeros(1, dtype=dtype)[0]
+        if dtype.kind == 'S':
+            col_exprs.append("batch_string_column(qry_cols[{0}], bufs[{1}][:n], dflt_{1})".format(idx, k))
+        else:
+            col_exprs.append("batch_column(qry_cols[{0}], bufs[{1}][:n], dflt_{1})".format(idx, k))
+
+    src = (
+        "def pack(rows):\n"
+        "    n = len(rows)\n"
+        "    bufs = next(buffer_ring)\n"
+        "    qry_cols = tuple(zip(*rows))\n"
+        "    return [\n"
+        + "".join("        {0},\n".format(e) for e in col_exprs) +
+        "    ]\n"
+    )
+    exec(src, namespace)
+
+    return namespace['pack']
+
+def batch_column(values, out, dflt):
+    """Convert one field's values from a batch of query results into the
+    NumPy array `out` (of the same length), replacing NULLs with `dflt`.
+    Returns `out`.
+    """
+    out[...] = _fill_nulls(values, dflt)
+    return out
+
+def batch_string_column(values, out, dflt):
+    """Same as `batch_column`, for fixed-width string fields.
+
+    PyTables string columns only hold ASCII, so if any value has non-ASCII
+    characters the column is folded to ASCII before conversion. The same
+    path turns `bytearray` values (which the connector returns for binary
+    columns) into `bytes`, since NumPy can't store them in a string array.
+    """
+    col = _fill_nulls(values, dflt)
+    try:
+        out[...] = col
+    except (UnicodeEncodeError, ValueError):
+        out[...] = _ascii_ufunc(col)
+    return out
+
+def _fill_nulls(values, dflt):
+    # `fromiter`, so that sequence-like values (e.g. `bytearray`) are kept as
+    # single elements rather than unpacked into another dimension
+    col = np.fromiter(values, dtype=object, count=len(values))
+    null_mask = np.equal(col, None)
+    if null_mask.any():
+        col[null_mask] = dflt
+    return col
+
+def _to_ascii(value):
+    if isinstance(value, str):
+        # Most values in a column are usually plain ASCII already
+        if value.isascii():
+            return value.encode('ascii')
+        return unicodedata.normalize('NFKD', value).encode('ascii', 'ignore')
+    if isinstance(value, bytearray):
+        return bytes(value)
+    return value
+
+_ascii_ufunc = np.frompyfunc(_to_ascii, 1, 1)
+
 def read_config_file(conf_file_path):
     """Parse a YAML config file for PyGraphETL."""
     with open(conf_file_path, 'r') as cf:
         yml_config = load(cf, Loader=Loader)
-    return yml_config
 
-def make_table_dict_descr(field_tuples):
-    descr = defaultdict()
-    for ft_name, ft_type in field_tuples:
-        descr[ft_name] = ft_type
-    return descr
+    return yml_config
 
-def make_table(h5file, group, table_name, table_fields):
-    """Create a PyTables table to store graph data in HDF5 format.
+def dump_pickle_atomic(obj, path):
+    """Pickle `obj` to `path` via a temporary file, so that concurrent
+    readers never see a partially written file."""
+    fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(os.path.abspath(path)))
+    try:
+        with os.fdopen(fd, 'wb') as fp:
+            pickle.dump(obj, fp, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp_path, path)
+    except BaseException:
+        os.unlink(tmp_path)
+        raise
+
+def schema_cache_key(config_file_path, mysql_config_file):
+    """Return the hex SHA-256 digest of a config file's contents and the
+    MySQL server that a MySQL option file connects to."""
+    digest = hashlib.sha256()
+    with open(config_file_path, 'rb') as fp:
+        digest.update(fp.read())
+    if mysql_config_file:
+        digest.update(repr(get_mysql_server(mysql_config_file)).encode())
+    return digest.hexdigest()
+
+def _read_schema_cache():
+    try:
+        with open(SCHEMA_CACHE_PATH, 'rb') as fp:
+            cache = pickle.load(fp)
+    except (OSError, EOFError, ValueError, pickle.UnpicklingError):
+        return dict()
+    return cache if isinstance(cache, dict) else dict()
+
+def load_schema_cache(cache_key):
+    """Return the source table descriptions and row estimates cached under
+    a `schema_cache_key`, as two dicts keyed by (source, table). Descriptions are
+    lists of (field name, MySQL type code, unsigned) tuples. Returns empty
+    dicts if nothing is cached, or if the entry was written in an older
+    format."""
+    entry = _read_schema_cache().get(cache_key)
+    if not (isinstance(entry, tuple) and len(entry) == 3 and entry[0] == SCHEMA_CACHE_FORMAT):
+        return dict(), dict()
+    return dict(entry[1]), dict(entry[2])
+
+def save_schema_cache(cache_key, table_descriptions, table_row_estimates):
+    """Store source table descriptions and row estimates under a
+    `schema_cache_key` in the on-disk schema cache, keeping other entries."""
+    cache = _read_schema_cache()
+    cache[cache_key] = (SCHEMA_CACHE_FORMAT, dict(table_descriptions), dict(table_row_estimates))
+    try:
+        os.makedirs(os.path.dirname(SCHEMA_CACHE_PATH), exist_ok=True)
+        dump_pickle_atomic(cache, SCHEMA_CACHE_PATH)
+    except OSError as err:
+        logger.warning("Couldn't write schema cache: %s", err)
+
+def make_table(h5file, group, table_name, table_fields, expectedrows=EXPECTED_ROWS):
+    """Create a column-wise PyTables table to store graph data in HDF5 format.
+
+    The table is a group named `table_name` containing one extendable array
+    per field, so that reading (or writing) a subset of fields only touches
+    the data for those fields. Arrays are Blosc-compressed and chunked at
+    roughly `CHUNK_BYTES` per chunk, or less for tables expected to be
+    smaller than that, but never below `MIN_CHUNK_BYTES` (so that a low row
+    estimate can't leave a large table split into tiny chunks).
+
+    HDF5 lists the arrays in a group alphabetically, so the field order is
+    recorded in the group's `FIELD_NAMES` attribute and each array's
+    `POSITION` attribute.
+
+    `table_fields` is a NumPy structured dtype giving the name and type of
+    each field. `expectedrows` defaults to the source tables' approximate
+    row counts, and can be set per node type with the `expected_rows` key in
+    the config file.
+
+    Returns
+    -------
+    dict of tables.EArray
+        The new arrays, keyed by field name.
     """
-
-    tab = h5file.create_table(group, table_name, table_fields, "{0} table".format(table_name))
-
-    return tab
\ No newline at end of file
+    tab_group = h5file.create_group(group, table_name, "{0} table".format(table_name))
+    tab_group._v_attrs.FIELD_NAMES = list(table_fields.names)
+
+    columns = {}
+    for position, col_name in enumerate(table_fields.names):
+        col_dtype = table_fields[col_name]
+        chunk_rows = max(1, min(CHUNK_BYTES // col_dtype.itemsize,
+                                max(MIN_CHUNK_BYTES // col_dtype.itemsize, expectedrows)))
+        columns[col_name] = h5file.create_earray(
+            tab_group, col_name,
+            atom=tables.Atom.from_dtype(col_dtype),
+            shape=(0,),
+            filters=FILTERS,
+            chunkshape=(chunk_rows,),
+            expectedrows=expectedrows
+        )
+        columns[col_name].attrs.POSITION = position
+
+    return columns
@@ -1,13 +1,50 @@
+from functools import lru_cache
+import logging
 import mysql.connector
+from mysql.connector.optionfiles import read_option_files
 import os
 
-def get_mysql_connection(config_file = "~/.my.cnf", database = None):
-    """Returns a connection to a MySQL server."""
-    if config_file == '~/.my.cnf':
-        config_file = os.path.join(os.path.expanduser("~"), '.my.cnf')
+logger = logging.getLogger(__name__)
+
+@lru_cache(maxsize=None)
+def _warn_if_pure_python():
+    """Warn (once) if connections will have to use the pure-Python connector."""
+    if not mysql.connector.HAVE_CEXT:
+        logger.warning("Using the pure-Python MySQL connector, as its C extension isn't installed. "
+                       "Install mysql-connector-python with the C extension for faster reads.")
+
+@lru_cache(maxsize=None)
+def _resolve_config_path(config_file):
+    """Expand `~` (or `~user`) at the start of an option file path."""
+    return os.path.expanduser(config_file)
+
+@lru_cache(maxsize=None)
+def _read_option_file(config_file):
+    """Parse a MySQL option file into connection arguments. Parsed once per
+    path, so the file is only read for the first connection that uses it."""
+    return read_option_files(option_files=config_file)
+
+def get_mysql_server(config_file = "~/.my.cnf"):
+    """Returns the (host, port, unix socket, user) that connections made with
+    an option file go to. Options the file doesn't set are `None`."""
+    cnx_args = _read_option_file(_resolve_config_path(config_file))
+    return tuple(cnx_args.get(k) for k in ('host', 'port', 'unix_socket', 'user'))
+
+def get_mysql_connection(config_file = "~/.my.cnf", database = None, compress = False):
+    """Returns a connection to a MySQL server.
+
+    The connection uses the Connector/Python C extension whenever it is
+    installed, even if an option file asks for the pure-Python one.
+
+    If `compress` is set, the connection uses the compressed client/server
+    protocol. This trades CPU time on both ends for less network traffic, so
+    it's mainly worth it for servers reached over slow links.
+    """
+    _warn_if_pure_python()
+    cnx_args = dict(_read_option_file(_resolve_config_path(config_file)))
+    cnx_args['compress'] = compress
+    cnx_args['use_pure'] = not mysql.connector.HAVE_CEXT
     if database:
-        cnx = mysql.connector.connect(option_files=config_file, database=database)
-    else:
-        cnx = mysql.connector.connect(option_files=config_file)
+        cnx_args['database'] = database
 
-    return cnx
\ No newline at end of file
+    return mysql.connector.connect(**cnx_args)
@@ -0,0 +1,32 @@
+import unittest
+
+import numpy as np
+
+from graphetl.graph_db_builder import make_batch_packer
+
+S32 = np.dtype('S32')
+
+
+class BytearrayValueTests(unittest.TestCase):
+    """The pure-Python connector returns `bytearray` for binary columns."""
+
+    def pack_strings(self, values):
+        packer = make_batch_packer([0], [S32])
+        (col,) = packer([(v,) for v in values])
+        return col.tolist()
+
+    def test_same_length(self):
+        self.assertEqual(self.pack_strings([bytearray(b'ab'), bytearray(b'cd')]), [b'ab', b'cd'])
+
+    def test_ragged(self):
+        self.assertEqual(self.pack_strings([bytearray(b'a'), bytearray(b'bcd'), b'ef']), [b'a', b'bcd', b'ef'])
+
+    def test_with_nulls(self):
+        self.assertEqual(self.pack_strings([None, bytearray(b'xy'), None]), [b'', b'xy', b''])
+
+    def test_with_non_ascii(self):
+        self.assertEqual(self.pack_strings([bytearray(b'xy'), 'café']), [b'xy', b'cafe'])
+
+
+if __name__ == '__main__':
+    unittest.main()
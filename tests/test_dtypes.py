@@ -0,0 +1,38 @@
+import unittest
+
+import numpy as np
+from mysql.connector import FieldType
+
+from graphetl.graph_db_builder import description_to_fields
+
+
+class UnsignedColumnTests(unittest.TestCase):
+    """`UNSIGNED` integer columns need unsigned dtypes to hold their full range."""
+
+    def test_unsigned_integers(self):
+        fields = description_to_fields([
+            ('a', FieldType.TINY, True),
+            ('b', FieldType.SHORT, True),
+            ('c', FieldType.INT24, True),
+            ('d', FieldType.LONG, True),
+            ('e', FieldType.LONGLONG, True),
+        ])
+        self.assertEqual([dt for _, dt in fields],
+                         [np.uint8, np.uint16, np.uint32, np.uint32, np.uint64])
+
+    def test_signed_integers(self):
+        fields = description_to_fields([('a', FieldType.LONG, False), ('b', FieldType.LONGLONG, False)])
+        self.assertEqual([dt for _, dt in fields], [np.int32, np.int64])
+
+    def test_unsigned_float(self):
+        # `DOUBLE UNSIGNED` (deprecated) has no unsigned counterpart
+        fields = description_to_fields([('a', FieldType.DOUBLE, True)])
+        self.assertEqual(fields, [('a', np.float64)])
+
+    def test_unsigned_max_value(self):
+        (_, dt), = description_to_fields([('a', FieldType.LONG, True)])
+        self.assertEqual(np.array([2**32 - 1], dtype=dt)[0], 2**32 - 1)
+
+
+if __name__ == '__main__':
+    unittest.main()
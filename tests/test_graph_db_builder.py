@@ -0,0 +1,114 @@
+import ast
+import inspect
+import unittest
+import warnings
+
+import numpy as np
+import tables
+
+from graphetl import graph_db_builder
+from graphetl.graph_db_builder import (
+    BATCH_SIZE, GraphDBBuilder, make_batch_packer, make_table, safe_stream_mysql_to_pytable)
+
+FIELDS = np.dtype([('id', np.int32), ('name', 'S32'), ('score', np.float64), ('extra', np.int64)])
+# `extra` isn't in the source, so is always filled with its default value
+FIELD_IDX_MAP = [0, 1, 2, None]
+
+
+class FakeCursor:
+    """Returns `rows` from `fetchmany()`, then raises `error` (if given) once
+    they've all been fetched."""
+
+    def __init__(self, rows, error=None):
+        self.rows = list(rows)
+        self.error = error
+        self.pos = 0
+
+    def fetchmany(self, size):
+        if self.pos >= len(self.rows) and self.error is not None:
+            raise self.error
+        batch = self.rows[self.pos:self.pos + size]
+        self.pos += len(batch)
+        return batch
+
+
+class StreamTests(unittest.TestCase):
+
+    def setUp(self):
+        self.h5file = tables.open_file('test.h5', 'w', driver='H5FD_CORE', driver_core_backing_store=0)
+        self.columns = make_table(self.h5file, '/', 'Node', FIELDS, expectedrows=100)
+
+    def tearDown(self):
+        self.h5file.close()
+
+    def stream(self, cursor):
+        packer = make_batch_packer(FIELD_IDX_MAP, [FIELDS[name] for name in FIELDS.names])
+        return safe_stream_mysql_to_pytable(cursor, self.columns, packer)
+
+    def read(self, name):
+        return self.columns[name][:].tolist()
+
+    def test_values(self):
+        self.stream(FakeCursor([(1, 'a', 0.5), (2, 'b', 1.5)]))
+        self.assertEqual(self.read('id'), [1, 2])
+        self.assertEqual(self.read('name'), [b'a', b'b'])
+        self.assertEqual(self.read('score'), [0.5, 1.5])
+        self.assertEqual(self.read('extra'), [0, 0])
+
+    def test_nulls(self):
+        self.stream(FakeCursor([(None, 'a', 0.5), (2, None, None)]))
+        self.assertEqual(self.read('id'), [0, 2])
+        self.assertEqual(self.read('name'), [b'a', b''])
+        self.assertEqual(self.read('score'), [0.5, 0.0])
+
+    def test_non_ascii(self):
+        self.stream(FakeCursor([(1, 'café', 0.0), (2, 'naïve', 0.0)]))
+        self.assertEqual(self.read('name'), [b'cafe', b'naive'])
+
+    def test_bytes(self):
+        self.stream(FakeCursor([(1, b'ab', 0.0), (2, bytearray(b'cde'), 0.0), (3, 'f', 0.0)]))
+        self.assertEqual(self.read('name'), [b'ab', b'cde', b'f'])
+
+    def test_empty(self):
+        self.stream(FakeCursor([]))
+        self.assertEqual(self.columns['id'].nrows, 0)
+
+    def test_tail_batch(self):
+        n_rows = 2 * BATCH_SIZE + 3
+        self.stream(FakeCursor((i, str(i), float(i)) for i in range(n_rows)))
+        self.assertEqual(self.read('id'), list(range(n_rows)))
+        self.assertEqual(self.read('name')[-3:], [str(i).encode() for i in range(n_rows - 3, n_rows)])
+        self.assertEqual(self.columns['extra'].nrows, n_rows)
+
+    def test_producer_error(self):
+        cursor = FakeCursor([(1, 'a', 0.0)] * (BATCH_SIZE + 1), error=RuntimeError("connection lost"))
+        with self.assertRaisesRegex(RuntimeError, "connection lost"):
+            self.stream(cursor)
+        # Batches fetched before the error are still written
+        self.assertEqual(self.columns['id'].nrows, BATCH_SIZE + 1)
+
+
+class ParseRelationshipsTests(unittest.TestCase):
+    """`GraphDBBuilder` and `parse_relationships` used to be defined twice in
+    the module, with the later definitions silently shadowing the earlier."""
+
+    def test_single_definitions(self):
+        with warnings.catch_warnings():
+            # The module docstring has LaTeX escapes (e.g. `\mathcal`)
+            warnings.simplefilter('ignore')
+            module = ast.parse(inspect.getsource(graph_db_builder))
+        classes = [node for node in module.body
+                   if isinstance(node, ast.ClassDef) and node.name == 'GraphDBBuilder']
+        self.assertEqual(len(classes), 1)
+        methods = [node.name for node in classes[0].body if isinstance(node, ast.FunctionDef)]
+        self.assertEqual(methods.count('parse_relationships'), 1)
+        self.assertEqual(methods.count('parse_nodes'), 1)
+
+    def test_parse_relationships(self):
+        builder = GraphDBBuilder.__new__(GraphDBBuilder)
+        with self.assertLogs(graph_db_builder.logger, 'WARNING'):
+            builder.parse_relationships()
+
+
+if __name__ == '__main__':
+    unittest.main()